@@ -1,7 +1,6 @@
 import streamlit as st
-import pdfplumber
 import pytesseract
-from PIL import Image
+from PIL import Image, ImageSequence
 import io
 import speech_recognition as sr
 import tempfile
@@ -9,7 +8,18 @@ import os
 import threading
 import base64
 import time
-from transformers import pipeline
+import re
+import json
+import math
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor, Future, CancelledError, wait
+import torch
+from transformers import pipeline, StoppingCriteria, StoppingCriteriaList
+from audiobook_export import EXPORT_FORMATS, export_audiobook, is_segment_audio, segment_key, segment_path
+from pdf_backends import ExtractionCancelled, extract_pages
+from echo_package import PACKAGE_EXTENSION, open_echo_package, write_echo_package
+from text_normalization import normalize_pages
 
 # Set tesseract path
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
@@ -31,6 +41,53 @@ def load_granite_model():
 # Initialize the model
 granite_generator = load_granite_model()
 
+# Serialize Granite calls between worker threads. Module globals are rebuilt on every
+# rerun, so anything shared with work started by an earlier run lives in the resource cache.
+@st.cache_resource
+def get_granite_lock():
+    return threading.Lock()
+
+granite_lock = get_granite_lock()
+
+# Maximum tokens generated per enhanced page
+MAX_NEW_TOKENS = 300
+
+# How often work waiting for the Granite model checks whether it has been superseded
+CANCEL_POLL_SECONDS = 0.1
+
+# Number of pages enhanced ahead of the current page by default
+DEFAULT_PREFETCH_PAGES = 2
+
+# Background worker for read-ahead page enhancement
+@st.cache_resource
+def get_prefetch_executor():
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="echoverse-prefetch")
+
+# Workers for extraction and on-demand enhancement, so a rerun can interrupt the wait
+@st.cache_resource
+def get_work_executor():
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="echoverse-work")
+
+# Server-wide record of work skipped because the request that started it was superseded
+@st.cache_resource
+def get_cancellation_metrics():
+    return {
+        "lock": threading.Lock(),
+        "cancelled_generations": 0,
+        "tokens_saved": 0,
+        "seconds_saved": 0.0,
+        "cancelled_extractions": 0,
+        "pages_skipped": 0
+    }
+
+cancellation_metrics = get_cancellation_metrics()
+
+# Add to the cancellation metrics (safe to call from worker threads)
+def record_cancellation(**saved):
+    with cancellation_metrics["lock"]:
+        for name, value in saved.items():
+            cancellation_metrics[name] += value
+
 # Set page configuration
 st.set_page_config(
     page_title="EchoVerse - AI for Visually Impaired Readers",
@@ -387,49 +444,260 @@ LANGUAGE_OPTIONS = {
     "Hindi": {"code": "hi", "voice": "Google हिन्दी"}
 }
 
-# Enhance text using Granite LLM
-def enhance_text_with_granite(text, mode="neutral"):
-    if granite_generator is None:
-        st.error("Granite model not loaded. Please check your internet connection.")
+# Stop generation at the next token once the request that started it is superseded
+class CancellationCriteria(StoppingCriteria):
+    def __init__(self, cancel_event):
+        self.cancel_event = cancel_event
+        self.tokens = 0
+    
+    def __call__(self, input_ids, scores, **kwargs):
+        self.tokens += 1
+        return torch.full(
+            (input_ids.shape[0],), self.cancel_event.is_set(), dtype=torch.bool, device=input_ids.device
+        )
+
+# Acquire a lock unless the request is cancelled first; returns whether the lock is held
+def acquire_unless_cancelled(lock, cancel_event):
+    while not cancel_event.is_set():
+        if lock.acquire(timeout=CANCEL_POLL_SECONDS):
+            return True
+    return False
+
+# Enhance text using Granite LLM (runs on a worker thread; errors are raised to the caller)
+def enhance_text_with_granite(text, mode="neutral", cancel_event=None):
+    if granite_generator is None or mode == "neutral":
         return text
     
-    if mode == "neutral":
+    if mode == "explanatory":
+        prompt = f"Rewrite the following text in a simpler and more explanatory way:\n\n{text}\n\nSimplified Version:"
+    elif mode == "summary":
+        prompt = f"Summarize the following text clearly and concisely:\n\n{text}\n\nSummary:"
+    else:
         return text
     
+    cancel_event = cancel_event or threading.Event()
+    # Work queued behind another session's generation may go stale while it waits for the model
+    if not acquire_unless_cancelled(granite_lock, cancel_event):
+        record_cancellation(cancelled_generations=1, tokens_saved=MAX_NEW_TOKENS)
+        raise CancelledError()
     try:
-        if mode == "explanatory":
-            prompt = f"Rewrite the following text in a simpler and more explanatory way:\n\n{text}\n\nSimplified Version:"
-        elif mode == "summary":
-            prompt = f"Summarize the following text clearly and concisely:\n\n{text}\n\nSummary:"
-        else:
-            return text
-
         # Generate enhanced text
+        criteria = CancellationCriteria(cancel_event)
+        started = time.monotonic()
         output = granite_generator(
             prompt, 
-            max_new_tokens=300, 
+            max_new_tokens=MAX_NEW_TOKENS, 
             temperature=0.7, 
             top_p=0.9,
             do_sample=True,
-            pad_token_id=granite_generator.tokenizer.eos_token_id
+            pad_token_id=granite_generator.tokenizer.eos_token_id,
+            stopping_criteria=StoppingCriteriaList([criteria])
         )
-        
-        # Extract the generated text
-        generated_text = output[0]["generated_text"]
-        
-        # Remove the prompt from the generated text
-        enhanced_text = generated_text.replace(prompt, "").strip()
-        
-        return enhanced_text
-        
-    except Exception as e:
-        st.error(f"Granite LLM Error: {str(e)}")
-        return text
+    finally:
+        granite_lock.release()
+    
+    # Discard partial output and estimate the time the remaining tokens would have taken
+    if cancel_event.is_set():
+        remaining_tokens = max(MAX_NEW_TOKENS - criteria.tokens, 0)
+        seconds_per_token = (time.monotonic() - started) / max(criteria.tokens, 1)
+        record_cancellation(
+            cancelled_generations=1,
+            tokens_saved=remaining_tokens,
+            seconds_saved=remaining_tokens * seconds_per_token
+        )
+        raise CancelledError()
+    
+    # Extract the generated text
+    generated_text = output[0]["generated_text"]
+    
+    # Remove the prompt from the generated text
+    enhanced_text = generated_text.replace(prompt, "").strip()
+    
+    return enhanced_text
+
+# Cancel work started for a superseded request and return the event for the current one
+def current_cancel_event(scope, request_key):
+    active = st.session_state.cancel_scopes.get(scope)
+    if active and active[0] == request_key:
+        return active[1]
+    if active:
+        active[1].set()
+    cancel_event = threading.Event()
+    st.session_state.cancel_scopes[scope] = (request_key, cancel_event)
+    return cancel_event
+
+# Cancellation event for enhancing the current document in a mode
+def enhancement_cancel_event(mode):
+    return current_cancel_event("enhancement", (st.session_state.document_key, mode))
+
+# Wait for background work while keeping the run interruptible. Each status update lets
+# Streamlit stop this run for a newer one; the work itself carries on and is either picked
+# up by the next run or cancelled by it if its request has been superseded.
+def wait_for(future, message):
+    if future.done():
+        return
+    status = st.empty()
+    started = time.monotonic()
+    try:
+        while not future.done():
+            status.caption(f"{message} ({time.monotonic() - started:.1f}s)")
+            wait([future], timeout=0.2)
+    finally:
+        status.empty()
+
+# A sentence ends at terminal punctuation (plus closing quotes/brackets) followed by whitespace
+SENTENCE_END = re.compile(r'[.!?]["\')\]]*\s+')
+
+# Start offsets of every sentence in a text
+def sentence_starts(text, base=0):
+    starts = [base] if text else []
+    starts.extend(base + match.end() for match in SENTENCE_END.finditer(text) if match.end() < len(text))
+    return starts
+
+# Build the page and sentence offset index for the concatenated document text
+def build_offset_index(pages):
+    page_offsets = array('I')
+    sentence_offsets = array('I')
+    position = 0
+    for page_text in pages:
+        page_offsets.append(position)
+        if page_text:
+            sentence_offsets.extend(sentence_starts(page_text, position))
+            position += len(page_text) + 1
+    page_offsets.append(position)
+    return page_offsets, sentence_offsets
+
+# Latest sentence start at or before an offset, never earlier than a lower bound
+def find_sentence_start(sentence_offsets, offset, lower_bound=0):
+    index = bisect_right(sentence_offsets, offset) - 1
+    if index < 0:
+        return lower_bound
+    return max(sentence_offsets[index], lower_bound)
+
+# Resolve a cached page enhancement, or None if none is ready. Cancelled and failed work
+# is dropped rather than cached, so it is redone the next time the page is needed.
+def resolve_enhanced_page(mode_cache, page_index):
+    cached = mode_cache.get(page_index)
+    if isinstance(cached, Future):
+        if not cached.done():
+            return None
+        try:
+            cached = cached.result()
+        except CancelledError:
+            del mode_cache[page_index]
+            return None
+        except Exception as e:
+            st.error(f"Granite LLM Error: {str(e)}")
+            del mode_cache[page_index]
+            return None
+        mode_cache[page_index] = cached
+    return cached
+
+# Enhance a single page on first use and keep the result for the current mode
+def get_enhanced_page(page_index, mode):
+    page_text = st.session_state.pages[page_index]
+    if mode == "neutral" or not page_text.strip():
+        return page_text
+    if granite_generator is None:
+        st.error("Granite model not loaded. Please check your internet connection.")
+        return page_text
+    
+    mode_cache = st.session_state.enhanced_pages.setdefault(mode, {})
+    enhanced = resolve_enhanced_page(mode_cache, page_index)
+    if enhanced is not None:
+        return enhanced
+    for _ in range(2):
+        if page_index not in mode_cache:
+            mode_cache[page_index] = get_work_executor().submit(
+                enhance_text_with_granite, page_text, mode, enhancement_cancel_event(mode)
+            )
+        future = mode_cache[page_index]
+        wait_for(future, f"🧠 Enhancing page {page_index + 1} with AI...")
+        enhanced = resolve_enhanced_page(mode_cache, page_index)
+        if enhanced is not None:
+            return enhanced
+        # Work cancelled by an earlier switch away from this mode is redone once under the
+        # current request; a failure falls back to the original text without being cached
+        if not isinstance(future.exception(), CancelledError):
+            break
+    return page_text
+
+# Enhance the next few pages in the background so reading does not wait on the LLM
+def prefetch_enhanced_pages(page_index, mode, count):
+    if mode == "neutral" or granite_generator is None:
+        return
+    
+    pages = st.session_state.pages
+    mode_cache = st.session_state.enhanced_pages.setdefault(mode, {})
+    executor = get_prefetch_executor()
+    cancel_event = enhancement_cancel_event(mode)
+    for next_index in range(page_index + 1, min(page_index + 1 + count, len(pages))):
+        # Clear out read-ahead work cancelled by an earlier mode switch before resubmitting
+        resolve_enhanced_page(mode_cache, next_index)
+        if next_index not in mode_cache and pages[next_index].strip():
+            mode_cache[next_index] = executor.submit(
+                enhance_text_with_granite, pages[next_index], mode, cancel_event
+            )
+
+# Text to read aloud from a position onwards, using only enhancements that are ready.
+# Returns the text and page marks [page, start in text, offset within page] for position reports.
+def get_reading_text(page_index, mode, page_offset=0):
+    pages = st.session_state.pages
+    if mode == "neutral":
+        page_offsets = st.session_state.page_offsets
+        page_start = page_offsets[page_index]
+        start = find_sentence_start(
+            st.session_state.sentence_offsets,
+            max(min(page_start + page_offset, page_offsets[page_index + 1] - 1), page_start),
+            page_start
+        )
+        page_marks = [[page_index, 0, start - page_start]]
+        page_marks.extend(
+            [next_index, page_offsets[next_index] - start, 0]
+            for next_index in range(page_index + 1, len(pages))
+            if page_offsets[next_index + 1] > page_offsets[next_index]
+        )
+        return st.session_state.extracted_text[start:], page_marks
+    
+    first_page = get_enhanced_page(page_index, mode)
+    start = 0
+    if page_offset:
+        start = find_sentence_start(sentence_starts(first_page), page_offset)
+    parts = [first_page[start:]]
+    page_marks = [[page_index, 0, start]]
+    position = len(parts[0]) + 1
+    page_offsets = st.session_state.page_offsets
+    mode_cache = st.session_state.enhanced_pages.setdefault(mode, {})
+    for next_index in range(page_index + 1, len(pages)):
+        if page_offsets[next_index + 1] == page_offsets[next_index]:
+            continue
+        enhanced = resolve_enhanced_page(mode_cache, next_index)
+        if enhanced is None:
+            break
+        parts.append(enhanced)
+        page_marks.append([next_index, position, 0])
+        position += len(enhanced) + 1
+    return "\n".join(parts), page_marks
+
+# Pick up the reading position the browser reported through the page URL
+def sync_reading_position():
+    try:
+        reported = (int(st.query_params["reading_page"]), int(st.query_params["reading_offset"]))
+    except (KeyError, ValueError):
+        return
+    if reported == st.session_state.reported_position:
+        return
+    st.session_state.reported_position = reported
+    page_index, page_offset = reported
+    if 0 <= page_index < len(st.session_state.pages):
+        st.session_state.current_page = page_index
+        st.session_state.reading_offset = max(page_offset, 0)
 
 # Browser-based text-to-speech using JavaScript
-def text_to_speech(text, language="English", voice_type="Female"):
-    # Clean text for JavaScript
-    clean_text = text.replace('"', '\\"').replace('\n', ' ')
+def text_to_speech(text, language="English", voice_type="Female", page_marks=None):
+    # Encode text for JavaScript; JSON keeps character offsets stable for position reports
+    clean_text = json.dumps(text).replace("</", "<\\/")
+    marks_json = json.dumps(page_marks or [])
     
     # Voice selection
     voice_name = LANGUAGE_OPTIONS[language]["voice"]
@@ -445,7 +713,7 @@ def text_to_speech(text, language="English", voice_type="Female"):
                 window.speechSynthesis.cancel();
                 
                 const speech = new SpeechSynthesisUtterance();
-                speech.text = "{clean_text}";
+                speech.text = {clean_text};
                 speech.volume = 1;
                 speech.rate = 1;
                 speech.pitch = 1;
@@ -462,6 +730,36 @@ def text_to_speech(text, language="English", voice_type="Female"):
                     speech.voice = preferredVoice;
                 }}
                 
+                // Report the page and offset being spoken back to the app via the page URL.
+                // charIndex counts UTF-16 code units while the marks count code points, so
+                // convert incrementally (boundaries arrive in order) by skipping low surrogates.
+                const pageMarks = {marks_json};
+                if (pageMarks.length > 0) {{
+                    let unitIndex = 0;
+                    let pointIndex = 0;
+                    speech.onboundary = function(event) {{
+                        if (event.charIndex < unitIndex) {{
+                            unitIndex = 0;
+                            pointIndex = 0;
+                        }}
+                        for (; unitIndex < event.charIndex; unitIndex++) {{
+                            const unit = speech.text.charCodeAt(unitIndex);
+                            if (unit < 0xDC00 || unit > 0xDFFF) pointIndex++;
+                        }}
+                        let mark = pageMarks[0];
+                        for (const candidate of pageMarks) {{
+                            if (candidate[1] > pointIndex) break;
+                            mark = candidate;
+                        }}
+                        try {{
+                            const url = new URL(window.parent.location.href);
+                            url.searchParams.set('reading_page', mark[0]);
+                            url.searchParams.set('reading_offset', mark[2] + pointIndex - mark[1]);
+                            window.parent.history.replaceState(null, '', url.toString());
+                        }} catch (e) {{}}
+                    }};
+                }}
+                
                 window.speechSynthesis.speak(speech);
             }} else {{
                 alert("Your browser doesn't support speech synthesis. Please try Chrome or Edge.");
@@ -493,28 +791,30 @@ def stop_speech():
     """
     st.components.v1.html(js_code, height=0)
 
-# Extract text from PDF
-def extract_text_from_pdf(uploaded_file):
-    text = ""
-    try:
-        with pdfplumber.open(uploaded_file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-    except Exception as e:
-        st.error(f"Error extracting text from PDF: {str(e)}")
-    return text
+# Extract text from PDF, one entry per page (runs on a worker thread)
+def extract_pages_from_pdf(uploaded_file, layout=False, cancel_event=None):
+    return extract_pages(uploaded_file, layout=layout, cancel_event=cancel_event)
 
-# Extract text from image using OCR
-def extract_text_from_image(uploaded_file):
-    text = ""
+# Extract text from image using OCR, checking for cancellation between frames (runs on a worker thread)
+def extract_text_from_image(uploaded_file, cancel_event=None):
+    image = Image.open(uploaded_file)
+    frame_count = getattr(image, "n_frames", 1)
+    frame_texts = []
+    for frame in ImageSequence.Iterator(image):
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExtractionCancelled(len(frame_texts), frame_count)
+        frame_texts.append(pytesseract.image_to_string(frame))
+    return "\n".join(frame_texts)
+
+# Extract the pages of an uploaded document, returning the PDF backend used (runs on a worker thread)
+def extract_document(uploaded_file, is_pdf, layout, cancel_event):
     try:
-        image = Image.open(uploaded_file)
-        text = pytesseract.image_to_string(image)
-    except Exception as e:
-        st.error(f"Error extracting text from image: {str(e)}")
-    return text
+        if is_pdf:
+            return extract_pages_from_pdf(uploaded_file, layout, cancel_event)
+        return None, [extract_text_from_image(uploaded_file, cancel_event)]
+    except ExtractionCancelled as e:
+        record_cancellation(cancelled_extractions=1, pages_skipped=e.pages_skipped)
+        raise
 
 # Listen for voice commands
 def listen_for_command():
@@ -549,9 +849,18 @@ def process_voice_command(command):
     
     command = command.lower()
     
-    if "start reading" in command or "read" in command:
+    if "continue" in command or "resume" in command:
+        # Resume from the start of the sentence the browser last reported
         if st.session_state.extracted_text:
-            # Set flag to trigger TTS
+            st.session_state.should_read = True
+            st.success(f"Resumed reading on page {st.session_state.current_page + 1}")
+        else:
+            st.error("No text available to read. Please upload a document first.")
+    
+    elif "start reading" in command or "read" in command:
+        if st.session_state.extracted_text:
+            # Set flag to trigger TTS from the top of the current page
+            st.session_state.reading_offset = 0
             st.session_state.should_read = True
             st.success("Started reading the document")
         else:
@@ -562,19 +871,14 @@ def process_voice_command(command):
         st.session_state.should_read = False
         st.success("Stopped reading")
     
-    elif "continue" in command or "resume" in command:
-        # For simplicity, we'll restart reading from the beginning
-        # In a more advanced implementation, we could track reading position
-        if st.session_state.extracted_text:
+    elif "next page" in command or "next" in command:
+        if st.session_state.current_page + 1 < len(st.session_state.pages):
+            st.session_state.current_page += 1
+            st.session_state.reading_offset = 0
             st.session_state.should_read = True
-            st.success("Resumed reading")
+            st.success(f"Reading page {st.session_state.current_page + 1}")
         else:
-            st.error("No text available to read. Please upload a document first.")
-    
-    elif "next page" in command or "next" in command:
-        # This would require tracking pages in PDF documents
-        # For now, we'll just indicate this feature is not fully implemented
-        st.info("Page navigation is not fully implemented in this version")
+            st.info("Already on the last page")
     
     elif "change language" in command:
         languages = list(LANGUAGE_OPTIONS.keys())
@@ -587,6 +891,184 @@ def process_voice_command(command):
     else:
         st.warning(f"Command not recognized: {command}")
 
+# Token count with the Granite tokenizer, or a rough estimate when it is unavailable
+def count_tokens(text):
+    if granite_generator is not None:
+        try:
+            return len(granite_generator.tokenizer.encode(text, add_special_tokens=False))
+        except Exception:
+            pass
+    return math.ceil(len(text) / 4)
+
+# Characters and tokens removed by normalization
+def normalization_savings(raw_pages, pages):
+    raw_text = "\n".join(raw_pages)
+    text = "\n".join(pages)
+    return {
+        "chars_before": len(raw_text),
+        "chars_saved": len(raw_text) - len(text),
+        "tokens_saved": count_tokens(raw_text) - count_tokens(text)
+    }
+
+# Replace the current document and drop enhancements made for the previous one
+def load_document(document_key, pages, extracted_text=None, offset_index=None):
+    for mode_cache in st.session_state.enhanced_pages.values():
+        for cached in mode_cache.values():
+            if isinstance(cached, Future):
+                cached.cancel()
+    
+    st.session_state.document_key = document_key
+    st.session_state.pages = pages
+    if extracted_text is None:
+        extracted_text = "".join(page_text + "\n" for page_text in pages if page_text)
+    st.session_state.extracted_text = extracted_text
+    st.session_state.enhanced_pages = {}
+    st.session_state.current_page = 0
+    st.session_state.audiobook_export = None
+    st.session_state.echo_package_export = None
+    st.session_state.package_audio = {}
+    st.session_state.package_audio_dir = None
+    st.session_state.page_offsets, st.session_state.sentence_offsets = offset_index or build_offset_index(pages)
+    st.session_state.reading_offset = 0
+    st.session_state.reported_position = None
+    for param in ("reading_page", "reading_offset"):
+        if param in st.query_params:
+            del st.query_params[param]
+
+# Reopen a saved .echo package without extracting or enhancing again
+def load_echo_package(document_key, uploaded_file):
+    try:
+        package = open_echo_package(uploaded_file)
+    except Exception as e:
+        st.error(f"Error opening EchoVerse package: {str(e)}")
+        load_document(document_key, [])
+        return
+    
+    load_document(
+        document_key,
+        package.pages,
+        package.text,
+        (package.page_offsets, package.sentence_offsets)
+    )
+    st.session_state.enhanced_pages = {
+        mode: package.enhanced_cache(mode) for mode in package.enhanced_modes
+    }
+    st.session_state.document_name = package.name
+    st.session_state.normalization_stats = package.metadata.get("normalization_stats")
+    
+    # Restore bundled audio for this session's exports only. Packages are untrusted, so their
+    # audio never enters the shared segment cache, and a segment is only accepted if its key
+    # matches the text it claims to voice and it is in the segment audio layout.
+    rejected = 0
+    for key in package.audio_keys:
+        data = package.audio(key)
+        if segment_key(*package.audio_source(key)) != key or not is_segment_audio(data):
+            rejected += 1
+            continue
+        if st.session_state.package_audio_dir is None:
+            # Removed when the session drops it, on the next document load or session end
+            st.session_state.package_audio_dir = tempfile.TemporaryDirectory(prefix="echoverse-package-")
+        path = os.path.join(st.session_state.package_audio_dir.name, f"{key}.wav")
+        with open(path, "wb") as audio_file:
+            audio_file.write(data)
+        st.session_state.package_audio[key] = path
+    if rejected:
+        st.warning(f"Skipped {rejected} audio segments that did not match their text")
+
+# Cached audio for a segment available to this session, or None
+def cached_segment_path(key):
+    if key in st.session_state.package_audio:
+        return st.session_state.package_audio[key]
+    path = segment_path(key)
+    return path if os.path.exists(path) else None
+
+# Save the current document, its enhancements and optionally its cached audio as a package
+def build_document_package(include_audio):
+    enhanced = {}
+    for mode, mode_cache in st.session_state.enhanced_pages.items():
+        enhanced[mode] = {}
+        for page_index in list(mode_cache):
+            enhanced_text = resolve_enhanced_page(mode_cache, page_index)
+            if enhanced_text is not None:
+                enhanced[mode][page_index] = enhanced_text
+    
+    audio = {}
+    if include_audio:
+        language_code = LANGUAGE_OPTIONS[st.session_state.language]["code"]
+        variants = [st.session_state.pages] + [list(mode_pages.values()) for mode_pages in enhanced.values()]
+        for variant in variants:
+            for page_text in variant:
+                key = segment_key(page_text, language_code, st.session_state.voice_type)
+                path = cached_segment_path(key) if page_text.strip() else None
+                if path:
+                    audio[key] = {
+                        "path": path,
+                        "text": page_text,
+                        "language_code": language_code,
+                        "voice_type": st.session_state.voice_type
+                    }
+    
+    package_file = io.BytesIO()
+    write_echo_package(
+        package_file,
+        st.session_state.document_name,
+        st.session_state.pages,
+        st.session_state.page_offsets,
+        st.session_state.sentence_offsets,
+        enhanced,
+        audio,
+        {"normalization_stats": st.session_state.normalization_stats}
+    )
+    st.session_state.echo_package_export = {
+        "file_name": f"{os.path.splitext(st.session_state.document_name)[0]}{PACKAGE_EXTENSION}",
+        "data": package_file.getvalue()
+    }
+    st.success(f"Package ready with {len(audio)} audio segments")
+
+# Synthesize the whole document into a downloadable audiobook
+def export_document_audio(output_format, use_narration_mode):
+    mode = st.session_state.tone if use_narration_mode else "neutral"
+    segments = [
+        (f"Page {page_index + 1}", get_enhanced_page(page_index, mode))
+        for page_index in range(len(st.session_state.pages))
+    ]
+    
+    progress_bar = st.progress(0, text="🎧 Synthesizing audio...")
+    def report_progress(done, total):
+        progress_bar.progress(done / total, text=f"🎧 Synthesized {done} of {total} pages")
+    
+    try:
+        audio_data, stats = export_audiobook(
+            segments,
+            output_format=output_format,
+            language_code=LANGUAGE_OPTIONS[st.session_state.language]["code"],
+            voice_type=st.session_state.voice_type,
+            title=st.session_state.document_name,
+            progress=report_progress,
+            restored_segments=st.session_state.package_audio
+        )
+    except Exception as e:
+        st.error(f"Error exporting audiobook: {str(e)}")
+        return
+    finally:
+        progress_bar.empty()
+    
+    export_format = EXPORT_FORMATS[output_format]
+    st.session_state.audiobook_export = {
+        "file_name": f"{os.path.splitext(st.session_state.document_name)[0]}.{export_format['extension']}",
+        "mime": export_format["mime"],
+        "data": audio_data
+    }
+    st.success(
+        f"Exported {stats['segments']} chapters "
+        f"({stats['synthesized']} synthesized, {stats['cached']} reused from cache)"
+    )
+
+# Keep the current page in sync with the page selector
+def on_page_change():
+    st.session_state.current_page = st.session_state.page_number - 1
+    st.session_state.reading_offset = 0
+
 # Main application
 def main():
     # Apply custom CSS
@@ -613,6 +1095,42 @@ def main():
         st.session_state.last_command = ""
     if 'enhanced_text' not in st.session_state:
         st.session_state.enhanced_text = ""
+    if 'pages' not in st.session_state:
+        st.session_state.pages = []
+    if 'document_key' not in st.session_state:
+        st.session_state.document_key = None
+    if 'enhanced_pages' not in st.session_state:
+        st.session_state.enhanced_pages = {}
+    if 'prefetch_pages' not in st.session_state:
+        st.session_state.prefetch_pages = DEFAULT_PREFETCH_PAGES
+    if 'document_name' not in st.session_state:
+        st.session_state.document_name = ""
+    if 'audiobook_export' not in st.session_state:
+        st.session_state.audiobook_export = None
+    if 'page_offsets' not in st.session_state:
+        st.session_state.page_offsets = array('I', [0])
+    if 'sentence_offsets' not in st.session_state:
+        st.session_state.sentence_offsets = array('I')
+    if 'reading_offset' not in st.session_state:
+        st.session_state.reading_offset = 0
+    if 'reported_position' not in st.session_state:
+        st.session_state.reported_position = None
+    if 'normalization_stats' not in st.session_state:
+        st.session_state.normalization_stats = None
+    if 'layout_extraction' not in st.session_state:
+        st.session_state.layout_extraction = False
+    if 'pdf_backend' not in st.session_state:
+        st.session_state.pdf_backend = None
+    if 'echo_package_export' not in st.session_state:
+        st.session_state.echo_package_export = None
+    if 'package_audio' not in st.session_state:
+        st.session_state.package_audio = {}
+    if 'package_audio_dir' not in st.session_state:
+        st.session_state.package_audio_dir = None
+    if 'cancel_scopes' not in st.session_state:
+        st.session_state.cancel_scopes = {}
+    if 'pending_extraction' not in st.session_state:
+        st.session_state.pending_extraction = None
     
     # Header
     st.markdown("""
@@ -657,10 +1175,31 @@ def main():
             label_visibility="collapsed"
         )
         
+        # PDF extraction selection
+        st.markdown("#### 📐 PDF Extraction")
+        extraction = st.radio(
+            "PDF Extraction",
+            ["Fast", "Layout-aware"],
+            index=1 if st.session_state.layout_extraction else 0,
+            label_visibility="collapsed"
+        )
+        
+        # Read-ahead selection
+        st.markdown("#### ⏩ Read-ahead Pages")
+        prefetch_pages = st.slider(
+            "Read-ahead Pages",
+            min_value=0,
+            max_value=10,
+            value=st.session_state.prefetch_pages,
+            label_visibility="collapsed"
+        )
+        
         # Update session state
         st.session_state.language = language
         st.session_state.voice_type = voice_type
         st.session_state.tone = tone.lower()
+        st.session_state.prefetch_pages = prefetch_pages
+        st.session_state.layout_extraction = extraction == "Layout-aware"
         
         # Voice preview
         if st.button("🔊 Preview Voice", use_container_width=True):
@@ -685,16 +1224,27 @@ def main():
             </ul>
         </div>
         """, unsafe_allow_html=True)
+        
+        # Work skipped because a newer request superseded it (all sessions)
+        with st.expander("⚡ Compute Saved"):
+            with cancellation_metrics["lock"]:
+                metrics = dict(cancellation_metrics)
+            st.metric("Generations stopped", metrics["cancelled_generations"])
+            st.metric("Tokens not generated", f"{metrics['tokens_saved']:,}")
+            st.metric("Generation time saved", f"{metrics['seconds_saved']:.1f}s")
+            st.metric("Extraction pages skipped", f"{metrics['pages_skipped']:,}")
     
     # File upload
     st.markdown("### 📤 Upload Document")
     uploaded_file = st.file_uploader(
-        "Upload PDF or Image", 
-        type=['pdf', 'png', 'jpg', 'jpeg'],
+        "Upload PDF, Image or EchoVerse Package", 
+        type=['pdf', 'png', 'jpg', 'jpeg', PACKAGE_EXTENSION.lstrip('.')],
         label_visibility="collapsed"
     )
     
     if uploaded_file is not None:
+        is_package = uploaded_file.name.lower().endswith(PACKAGE_EXTENSION)
+        
         # File details
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -702,26 +1252,87 @@ def main():
         with col2:
             st.metric("Size", f"{uploaded_file.size / 1024:.1f} KB")
         with col3:
-            st.metric("Type", uploaded_file.type.split('/')[-1].upper())
+            st.metric("Type", "ECHO" if is_package else uploaded_file.type.split('/')[-1].upper())
+        
+        # Extract text once per document; reruns reuse the pages and enhancements
+        document_key = getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+        if uploaded_file.type == "application/pdf":
+            document_key = f"{document_key}:{'layout' if st.session_state.layout_extraction else 'fast'}"
+        # Uploading another file cancels an extraction still running for the previous one
+        extraction_cancel_event = current_cancel_event("extraction", document_key)
+        if st.session_state.document_key != document_key and is_package:
+            load_echo_package(document_key, uploaded_file)
+        elif st.session_state.document_key != document_key:
+            is_pdf = uploaded_file.type == "application/pdf"
+            pending = st.session_state.pending_extraction
+            if not pending or pending["document_key"] != document_key:
+                pending = {
+                    "document_key": document_key,
+                    "future": get_work_executor().submit(
+                        extract_document,
+                        uploaded_file,
+                        is_pdf,
+                        st.session_state.layout_extraction,
+                        extraction_cancel_event
+                    )
+                }
+                st.session_state.pending_extraction = pending
+            wait_for(pending["future"], "📖 Extracting text...")
+            st.session_state.pending_extraction = None
+            
+            try:
+                st.session_state.pdf_backend, raw_pages = pending["future"].result()
+            except Exception as e:
+                st.error(f"Error extracting text from {'PDF' if is_pdf else 'image'}: {str(e)}")
+                raw_pages = []
+            
+            # Clean the text once so neither Granite nor the voice spends time on page furniture
+            pages = normalize_pages(raw_pages)
+            load_document(document_key, pages)
+            st.session_state.document_name = uploaded_file.name
+            st.session_state.normalization_stats = normalization_savings(raw_pages, pages)
+        extracted_text = st.session_state.extracted_text
+        
+        # Switching document or narration mode cancels enhancements started for the old one
+        enhancement_cancel_event(st.session_state.tone)
+        sync_reading_position()
+        
+        # Extraction details
+        if uploaded_file.type == "application/pdf" and st.session_state.pdf_backend:
+            st.caption(f"📄 Extracted with {st.session_state.pdf_backend}")
         
-        # Extract text
-        with st.spinner("📖 Extracting text..."):
-            if uploaded_file.type == "application/pdf":
-                extracted_text = extract_text_from_pdf(uploaded_file)
-            else:
-                extracted_text = extract_text_from_image(uploaded_file)
+        # Normalization savings
+        stats = st.session_state.normalization_stats
+        if stats and stats["chars_saved"] > 0:
+            st.caption(
+                f"🧹 Removed headers, footers and hyphenation: {stats['chars_saved']:,} characters "
+                f"({stats['chars_saved'] / stats['chars_before']:.0%}), about {stats['tokens_saved']:,} tokens"
+            )
         
         if extracted_text:
-            st.session_state.extracted_text = extracted_text
+            page_count = len(st.session_state.pages)
+            st.session_state.current_page = min(st.session_state.current_page, page_count - 1)
             
-            # Enhance text with Granite LLM based on selected tone
-            if st.session_state.tone != "neutral":
-                with st.spinner("🧠 Enhancing text with AI..."):
-                    st.session_state.enhanced_text = enhance_text_with_granite(
-                        extracted_text, st.session_state.tone
-                    )
-            else:
-                st.session_state.enhanced_text = extracted_text
+            # Page selector
+            if page_count > 1:
+                st.session_state.page_number = st.session_state.current_page + 1
+                st.number_input(
+                    f"Page (of {page_count})",
+                    min_value=1,
+                    max_value=page_count,
+                    key="page_number",
+                    on_change=on_page_change
+                )
+            
+            # Enhance only the current page, then read ahead in the background
+            st.session_state.enhanced_text = get_enhanced_page(
+                st.session_state.current_page, st.session_state.tone
+            )
+            prefetch_enhanced_pages(
+                st.session_state.current_page,
+                st.session_state.tone,
+                st.session_state.prefetch_pages
+            )
             
             # Text preview
             with st.expander("📝 View Extracted Text", expanded=True):
@@ -729,7 +1340,7 @@ def main():
                     st.info(f"Text enhanced with {st.session_state.tone} mode")
                     st.text_area("Enhanced Text", st.session_state.enhanced_text, height=300, label_visibility="collapsed")
                 else:
-                    st.text_area("Original Text", extracted_text, height=300, label_visibility="collapsed")
+                    st.text_area("Original Text", st.session_state.enhanced_text, height=300, label_visibility="collapsed")
             
             # Current settings
             st.info(f"🎯 Settings: {st.session_state.language}, {st.session_state.voice_type} voice, {st.session_state.tone} mode")
@@ -740,10 +1351,15 @@ def main():
             
             with col1:
                 if st.button("🔊 Read Text", use_container_width=True, type="primary"):
+                    st.session_state.reading_offset = 0
+                    reading_text, page_marks = get_reading_text(
+                        st.session_state.current_page, st.session_state.tone
+                    )
                     text_to_speech(
-                        st.session_state.enhanced_text, 
+                        reading_text, 
                         st.session_state.language, 
-                        st.session_state.voice_type
+                        st.session_state.voice_type,
+                        page_marks
                     )
             
             with col2:
@@ -774,16 +1390,70 @@ def main():
             
             # Trigger TTS if should_read is True
             if st.session_state.get('should_read', False):
+                reading_text, page_marks = get_reading_text(
+                    st.session_state.current_page,
+                    st.session_state.tone,
+                    st.session_state.reading_offset
+                )
+                prefetch_enhanced_pages(
+                    st.session_state.current_page,
+                    st.session_state.tone,
+                    st.session_state.prefetch_pages
+                )
                 text_to_speech(
-                    st.session_state.enhanced_text, 
+                    reading_text, 
                     st.session_state.language, 
-                    st.session_state.voice_type
+                    st.session_state.voice_type,
+                    page_marks
                 )
                 st.session_state.should_read = False
+            
+            # Audiobook export
+            st.markdown("### 💾 Export Audiobook")
+            col1, col2 = st.columns(2)
+            with col1:
+                output_format = st.selectbox("Audio Format", options=list(EXPORT_FORMATS.keys()))
+            with col2:
+                use_narration_mode = st.checkbox(
+                    f"Use {st.session_state.tone} narration mode",
+                    value=True,
+                    disabled=st.session_state.tone == "neutral"
+                )
+            
+            if st.button("🎧 Export Audiobook", use_container_width=True):
+                export_document_audio(output_format, use_narration_mode)
+            
+            if st.session_state.audiobook_export:
+                st.download_button(
+                    "⬇ Download Audiobook",
+                    data=st.session_state.audiobook_export["data"],
+                    file_name=st.session_state.audiobook_export["file_name"],
+                    mime=st.session_state.audiobook_export["mime"],
+                    use_container_width=True
+                )
+            
+            # Document package
+            st.markdown("### 📦 Save Document Package")
+            include_audio = st.checkbox("Include cached audio segments")
+            if st.button("📦 Build .echo Package", use_container_width=True):
+                build_document_package(include_audio)
+            
+            if st.session_state.echo_package_export:
+                st.download_button(
+                    "⬇ Download Package",
+                    data=st.session_state.echo_package_export["data"],
+                    file_name=st.session_state.echo_package_export["file_name"],
+                    mime="application/octet-stream",
+                    use_container_width=True
+                )
         
         else:
             st.error("❌ Could not extract text from the file")
     else:
+        # Removing the file cancels any work still running for it
+        current_cancel_event("extraction", None)
+        current_cancel_event("enhancement", None)
+        
         # Instructions
         st.markdown("""
         <div class="card">
@@ -794,6 +1464,7 @@ def main():
             <ul>
                 <li>PDF documents</li>
                 <li>Images (PNG, JPG, JPEG)</li>
+                <li>Saved EchoVerse packages (.echo)</li>
             </ul>
             
             <h4>🎯 Features:</h4>
@@ -803,6 +1474,7 @@ def main():
                 <li>AI-enhanced text (explanatory/summary modes)</li>
                 <li>Voice commands</li>
                 <li>Browser-based text-to-speech</li>
+                <li>Audiobook export (Opus/MP3 with page chapters)</li>
             </ul>
             
             <h4>🔊 Audio Requirements:</h4>
@@ -0,0 +1,177 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Synthesized segments are cached here, keyed by their text and voice settings
+SEGMENT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "echoverse", "segments")
+
+# Segments are normalized to this PCM layout so they can be concatenated losslessly
+SEGMENT_SAMPLE_RATE = 22050
+
+# Supported export formats
+EXPORT_FORMATS = {
+    "Opus": {"extension": "opus", "mime": "audio/ogg", "codec": ["-c:a", "libopus", "-b:a", "32k"]},
+    "MP3": {"extension": "mp3", "mime": "audio/mpeg", "codec": ["-c:a", "libmp3lame", "-b:a", "64k", "-id3v2_version", "3"]}
+}
+
+# Cache key for one segment; any change to the text or voice produces a new key
+def segment_key(text, language_code, voice_type):
+    digest = hashlib.sha256()
+    digest.update(f"pyttsx3|{language_code}|{voice_type}|".encode("utf-8"))
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+# Path of a cached segment
+def segment_path(key):
+    return os.path.join(SEGMENT_CACHE_DIR, f"{key}.wav")
+
+# Pick the installed offline voice closest to the requested language and type
+def select_voice(engine, language_code, voice_type):
+    voices = engine.getProperty("voices")
+    matches = []
+    for voice in voices:
+        languages = " ".join(
+            lang.decode("utf-8", "ignore") if isinstance(lang, bytes) else str(lang)
+            for lang in (voice.languages or [])
+        )
+        if language_code in languages.lower() or language_code in voice.id.lower():
+            matches.append(voice)
+    for voice in matches:
+        if (voice.gender or "").lower() == voice_type.lower():
+            return voice.id
+    if matches:
+        return matches[0].id
+    return None
+
+# Synthesize one segment with the offline engine (runs in a worker process)
+def synthesize_segment(text, language_code, voice_type, output_path):
+    import pyttsx3
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with tempfile.TemporaryDirectory() as work_dir:
+        raw_path = os.path.join(work_dir, "raw")
+        engine = pyttsx3.init()
+        voice_id = select_voice(engine, language_code, voice_type)
+        if voice_id:
+            engine.setProperty("voice", voice_id)
+        engine.save_to_file(text, raw_path)
+        engine.runAndWait()
+        engine.stop()
+
+        # Engines write WAV or AIFF depending on the platform; normalize to mono PCM
+        normalized_path = os.path.join(work_dir, "segment.wav")
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error", "-i", raw_path,
+             "-ac", "1", "-ar", str(SEGMENT_SAMPLE_RATE), "-c:a", "pcm_s16le", normalized_path],
+            check=True
+        )
+        # Publish atomically so a crashed worker never leaves a truncated cache entry
+        os.replace(normalized_path, output_path)
+    return output_path
+
+# Duration of a cached segment in milliseconds
+def segment_duration_ms(path):
+    with wave.open(path, "rb") as segment:
+        return int(segment.getnframes() * 1000 / segment.getframerate())
+
+# Whether audio data is a segment in the cache layout: mono 16-bit PCM WAV at SEGMENT_SAMPLE_RATE
+def is_segment_audio(data):
+    try:
+        with wave.open(io.BytesIO(data), "rb") as segment:
+            return (
+                segment.getnchannels() == 1
+                and segment.getsampwidth() == 2
+                and segment.getframerate() == SEGMENT_SAMPLE_RATE
+                and segment.getcomptype() == "NONE"
+                and segment.getnframes() > 0
+            )
+    except (wave.Error, EOFError):
+        return False
+
+# Escape a value for ffmpeg's FFMETADATA format
+def escape_metadata(value):
+    for char in ("\\", "=", ";", "#", "\n"):
+        value = value.replace(char, "\\" + char)
+    return value
+
+# Synthesize, concatenate and encode an audiobook with one chapter per segment; returns the encoded bytes.
+# restored_segments maps segment keys to audio files only this export may use, such as audio
+# restored from a package; they are used ahead of the shared cache and never copied into it.
+def export_audiobook(segments, output_format="Opus", language_code="en", voice_type="Female",
+                     title="EchoVerse Audiobook", max_workers=None, progress=None, restored_segments=None):
+    if shutil.which("ffmpeg") is None:
+        raise RuntimeError("ffmpeg is required for audiobook export but was not found on PATH")
+
+    export_format = EXPORT_FORMATS[output_format]
+    restored_segments = restored_segments or {}
+    chapters = []
+    for chapter_title, text in segments:
+        if text.strip():
+            key = segment_key(text, language_code, voice_type)
+            chapters.append((chapter_title, text, restored_segments.get(key) or segment_path(key)))
+    if not chapters:
+        raise ValueError("There is no text to export")
+
+    # Synthesize only the segments that are not cached yet
+    missing = {}
+    for _, text, path in chapters:
+        if not os.path.exists(path):
+            missing[path] = text
+
+    done = len(chapters) - len(missing)
+    if progress:
+        progress(done, len(chapters))
+    if missing:
+        # Spawn rather than fork: the app process already runs torch and several thread pools
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [
+                pool.submit(synthesize_segment, text, language_code, voice_type, path)
+                for path, text in missing.items()
+            ]
+            for future in as_completed(futures):
+                future.result()
+                done += 1
+                if progress:
+                    progress(done, len(chapters))
+
+    with tempfile.TemporaryDirectory(prefix="echoverse-export-") as output_dir:
+        list_path = os.path.join(output_dir, "segments.txt")
+        metadata_path = os.path.join(output_dir, "chapters.txt")
+        output_path = os.path.join(output_dir, f"audiobook.{export_format['extension']}")
+
+        # Concat list and chapter metadata; chapter boundaries follow segment boundaries
+        with open(list_path, "w", encoding="utf-8") as list_file, \
+                open(metadata_path, "w", encoding="utf-8") as metadata_file:
+            metadata_file.write(";FFMETADATA1\n")
+            metadata_file.write(f"title={escape_metadata(title)}\n")
+            start = 0
+            for chapter_title, _, path in chapters:
+                list_file.write("file '{}'\n".format(path.replace("'", "'\\''")))
+                end = start + segment_duration_ms(path)
+                metadata_file.write("[CHAPTER]\nTIMEBASE=1/1000\n")
+                metadata_file.write(f"START={start}\nEND={end}\ntitle={escape_metadata(chapter_title)}\n")
+                start = end
+
+        subprocess.run(
+            ["ffmpeg", "-y", "-loglevel", "error",
+             "-f", "concat", "-safe", "0", "-i", list_path,
+             "-i", metadata_path, "-map", "0:a", "-map_metadata", "1", "-map_chapters", "1",
+             *export_format["codec"], output_path],
+            check=True
+        )
+        with open(output_path, "rb") as audio_file:
+            audio_data = audio_file.read()
+
+    stats = {
+        "segments": len(chapters),
+        "synthesized": len(missing),
+        "cached": len(chapters) - len(missing),
+        "duration_ms": start
+    }
+    return audio_data, stats
@@ -0,0 +1,105 @@
+import argparse
+import glob
+import os
+import re
+import tempfile
+import time
+from collections import Counter
+
+from make_pdf_fixtures import build_fixtures, read_ground_truth
+from pdf_backends import PDF_BACKENDS, read_source
+
+# Documents without a ground-truth text file (see make_pdf_fixtures.py) are scored
+# against this backend's layout-aware output instead
+REFERENCE_BACKEND = "pdfplumber"
+
+# Multiset of the words and adjacent word pairs of a document, ignoring whitespace and line
+# layout. The pairs make reading-order errors, such as interleaved columns, lower the score.
+def word_counts(pages):
+    words = re.findall(r"\w+", " ".join(pages).lower())
+    return Counter(words) + Counter(zip(words, words[1:]))
+
+# F1 over words and word pairs between a backend's output and the reference
+def text_fidelity(pages, reference_pages):
+    words = word_counts(pages)
+    reference = word_counts(reference_pages)
+    total = sum(words.values()) + sum(reference.values())
+    if total == 0:
+        return 1.0
+    return 2 * sum((words & reference).values()) / total
+
+# Best-of-N extraction time for one document
+def time_backend(extract, data, repeats):
+    best = float("inf")
+    pages = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        pages = extract(data)
+        best = min(best, time.perf_counter() - start)
+    return best, pages
+
+# Time every installed backend on the documents and print a summary table
+def run_benchmark(paths, repeats):
+    totals = {name: {"pages": 0, "seconds": 0.0, "fidelity": []} for name in PDF_BACKENDS}
+    unavailable = set()
+    references = Counter()
+    for path in paths:
+        data = read_source(path)
+        results = {}
+        for name, extract in PDF_BACKENDS.items():
+            if name in unavailable:
+                continue
+            try:
+                results[name] = time_backend(extract, data, repeats)
+            except ImportError:
+                unavailable.add(name)
+            except Exception as e:
+                print(f"{os.path.basename(path)}: {name} failed: {e}")
+
+        reference = read_ground_truth(path)
+        if reference is not None:
+            references["ground truth"] += 1
+        elif REFERENCE_BACKEND in results:
+            reference = results[REFERENCE_BACKEND][1]
+            references[REFERENCE_BACKEND] += 1
+        for name, (seconds, pages) in results.items():
+            totals[name]["pages"] += len(pages)
+            totals[name]["seconds"] += seconds
+            if reference is not None:
+                totals[name]["fidelity"].append(text_fidelity(pages, reference))
+
+    print(f"{len(paths)} documents, best of {repeats} runs")
+    if references:
+        print("Fidelity scored against " + ", ".join(f"{source} ({count})" for source, count in references.items()))
+    print(f"{'backend':<12} {'pages':>8} {'seconds':>10} {'pages/sec':>10} {'fidelity':>9}")
+    for name, total in totals.items():
+        if name in unavailable:
+            print(f"{name:<12} {'not installed':>39}")
+            continue
+        pages_per_sec = total["pages"] / total["seconds"] if total["seconds"] else 0.0
+        fidelity = (
+            f"{sum(total['fidelity']) / len(total['fidelity']):.3f}" if total["fidelity"] else "n/a"
+        )
+        print(f"{name:<12} {total['pages']:>8} {total['seconds']:>10.3f} {pages_per_sec:>10.1f} {fidelity:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PDF text backends on a corpus of PDF fixtures")
+    parser.add_argument(
+        "corpus", nargs="?",
+        help="Directory containing PDF files; defaults to the generated fixtures from make_pdf_fixtures.py"
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per document; the fastest is kept")
+    args = parser.parse_args()
+
+    if args.corpus is None:
+        with tempfile.TemporaryDirectory() as corpus:
+            run_benchmark(build_fixtures(corpus), args.repeats)
+        return
+
+    paths = sorted(glob.glob(os.path.join(args.corpus, "**", "*.pdf"), recursive=True))
+    if not paths:
+        parser.error(f"No PDF files found in {args.corpus}")
+    run_benchmark(paths, args.repeats)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import MutableMapping, Sequence
+
+# File layout: fixed header, 8-byte aligned raw sections, JSON manifest at the end.
+# The header points at the manifest; the manifest maps section names to (offset, length).
+# Text sections are UTF-8 and offset sections are little-endian uint32 arrays, so a
+# package can be memory-mapped and sliced without parsing or copying the whole file.
+MAGIC = b"ECHOPKG\x00"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIQQ")
+ALIGNMENT = 8
+
+# File extension for packages
+PACKAGE_EXTENSION = ".echo"
+
+# Audio segments are keyed by a SHA-256 hex digest; nothing else may reach a cache path
+AUDIO_KEY = re.compile(r"[0-9a-f]{64}")
+
+# Reject audio keys that are not plain SHA-256 hex digests
+def check_audio_key(key):
+    if not isinstance(key, str) or not AUDIO_KEY.fullmatch(key):
+        raise ValueError(f"Invalid audio segment key {key!r}")
+    return key
+
+# Pack an offset array as little-endian bytes
+def array_bytes(values):
+    packed = array("I", values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+# UTF-8 text blob and byte offsets for a list of page texts joined as "page\n"
+def encode_pages(pages):
+    blob = bytearray()
+    byte_offsets = [0]
+    for page_text in pages:
+        if page_text:
+            blob += (page_text + "\n").encode("utf-8")
+        byte_offsets.append(len(blob))
+    return bytes(blob), byte_offsets
+
+# Write a processed document as a package to a binary file object.
+# audio maps segment keys to dicts with the cached file "path", the source "text",
+# "language_code" and "voice_type", so readers can recompute and verify each key.
+def write_echo_package(target, name, pages, page_offsets, sentence_offsets,
+                       enhanced=None, audio=None, metadata=None):
+    sections = {}
+    position = HEADER.size
+
+    def add_section(section_name, data):
+        nonlocal position
+        padding = -position % ALIGNMENT
+        target.write(b"\x00" * padding)
+        position += padding
+        target.write(data)
+        sections[section_name] = [position, len(data)]
+        position += len(data)
+
+    target.write(b"\x00" * HEADER.size)
+
+    text, page_byte_offsets = encode_pages(pages)
+    add_section("text", text)
+    add_section("page_byte_offsets", array_bytes(page_byte_offsets))
+    add_section("page_offsets", array_bytes(page_offsets))
+    add_section("sentence_offsets", array_bytes(sentence_offsets))
+
+    enhanced_modes = []
+    for mode, mode_pages in (enhanced or {}).items():
+        page_indices = sorted(mode_pages)
+        if not page_indices:
+            continue
+        mode_text, mode_byte_offsets = encode_pages([mode_pages[index] for index in page_indices])
+        add_section(f"enhanced/{mode}/text", mode_text)
+        add_section(f"enhanced/{mode}/pages", array_bytes(page_indices))
+        add_section(f"enhanced/{mode}/byte_offsets", array_bytes(mode_byte_offsets))
+        enhanced_modes.append(mode)
+
+    audio_segments = {}
+    for key, segment in (audio or {}).items():
+        check_audio_key(key)
+        with open(segment["path"], "rb") as audio_file:
+            add_section(f"audio/{key}", audio_file.read())
+        add_section(f"audio/{key}/text", segment["text"].encode("utf-8"))
+        audio_segments[key] = {
+            "language_code": segment["language_code"],
+            "voice_type": segment["voice_type"]
+        }
+
+    manifest = json.dumps({
+        "name": name,
+        "page_count": len(pages),
+        "sections": sections,
+        "enhanced_modes": enhanced_modes,
+        "audio": audio_segments,
+        "metadata": metadata or {}
+    }).encode("utf-8")
+    target.write(manifest)
+    target.seek(0)
+    target.write(HEADER.pack(MAGIC, FORMAT_VERSION, position, len(manifest)))
+    target.seek(0, os.SEEK_END)
+
+# Read-only view of a package held in a memory map or an in-memory buffer.
+# Views into the buffer are handed out freely, so a memory map is closed when the package is collected.
+class EchoPackage:
+    def __init__(self, buffer):
+        self.buffer = memoryview(buffer)
+        magic, version, manifest_offset, manifest_length = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not an EchoVerse package")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Unsupported package version {version}")
+        self.manifest = json.loads(bytes(self.buffer[manifest_offset:manifest_offset + manifest_length]))
+        self.sections = self.manifest["sections"]
+        self.name = self.manifest["name"]
+        self.metadata = self.manifest["metadata"]
+        for key in self.audio_keys:
+            check_audio_key(key)
+        self.page_byte_offsets = self.offsets("page_byte_offsets")
+        self.page_offsets = self.offsets("page_offsets")
+        self.sentence_offsets = self.offsets("sentence_offsets")
+        self.pages = PackagePages(self, "text", self.page_byte_offsets)
+        self.text = PackageText(self)
+
+    # Raw bytes of a section, without copying
+    def section(self, name):
+        offset, length = self.sections[name]
+        return self.buffer[offset:offset + length]
+
+    # uint32 offset array of a section; zero-copy on little-endian hosts
+    def offsets(self, name):
+        data = self.section(name)
+        if sys.byteorder == "little":
+            return data.cast("I")
+        values = array("I", bytes(data))
+        values.byteswap()
+        return values
+
+    # Decode the UTF-8 bytes between two offsets of a text section
+    def decode(self, name, start, end):
+        return bytes(self.section(name)[start:end]).decode("utf-8")
+
+    @property
+    def enhanced_modes(self):
+        return self.manifest["enhanced_modes"]
+
+    # Enhanced pages of one mode, decoded only when looked up
+    def enhanced_cache(self, mode):
+        if mode not in self.enhanced_modes:
+            return {}
+        return PackageVariantCache(self, mode)
+
+    @property
+    def audio_keys(self):
+        return list(self.manifest["audio"])
+
+    # Raw bytes of a cached audio segment
+    def audio(self, key):
+        check_audio_key(key)
+        return self.section(f"audio/{key}")
+
+    # Text, language code and voice type an audio segment was synthesized from
+    def audio_source(self, key):
+        check_audio_key(key)
+        settings = self.manifest["audio"][key]
+        text = self.decode(f"audio/{key}/text", 0, self.sections[f"audio/{key}/text"][1])
+        return text, settings["language_code"], settings["voice_type"]
+
+# Lazily decoded page texts of a text section
+class PackagePages(Sequence):
+    def __init__(self, package, section_name, byte_offsets):
+        self.package = package
+        self.section_name = section_name
+        self.byte_offsets = byte_offsets
+
+    def __len__(self):
+        return len(self.byte_offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("page index out of range")
+        start, end = self.byte_offsets[index], self.byte_offsets[index + 1]
+        # Pages are stored with a trailing newline separator
+        return self.package.decode(self.section_name, start, end)[:-1]
+
+# Document text that decodes only the pages a slice touches
+class PackageText:
+    def __init__(self, package):
+        self.package = package
+
+    def __len__(self):
+        return self.package.page_offsets[-1]
+
+    def __bool__(self):
+        return len(self) > 0
+
+    # Byte offset of a character offset in the text section
+    def byte_offset(self, char_offset):
+        page_offsets = self.package.page_offsets
+        page_byte_offsets = self.package.page_byte_offsets
+        if char_offset >= page_offsets[-1]:
+            return page_byte_offsets[-1]
+        page_index = bisect_right(page_offsets, char_offset) - 1
+        page_start = page_byte_offsets[page_index]
+        page_text = self.package.decode("text", page_start, page_byte_offsets[page_index + 1])
+        return page_start + len(page_text[:char_offset - page_offsets[page_index]].encode("utf-8"))
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise TypeError("package text only supports contiguous slices")
+        start, stop, _ = index.indices(len(self))
+        if start >= stop:
+            return ""
+        return self.package.decode("text", self.byte_offset(start), self.byte_offset(stop))
+
+    def __str__(self):
+        return self[:]
+
+# Enhanced pages of one mode. Stored pages are listed like any other entry but only
+# decoded on first lookup; pages added later live alongside them.
+class PackageVariantCache(MutableMapping):
+    def __init__(self, package, mode):
+        self.pages = PackagePages(package, f"enhanced/{mode}/text", package.offsets(f"enhanced/{mode}/byte_offsets"))
+        self.stored = {
+            page_index: position
+            for position, page_index in enumerate(package.offsets(f"enhanced/{mode}/pages"))
+        }
+        self.loaded = {}
+
+    def __getitem__(self, page_index):
+        if page_index not in self.loaded:
+            if page_index not in self.stored:
+                raise KeyError(page_index)
+            self.loaded[page_index] = self.pages[self.stored.pop(page_index)]
+        return self.loaded[page_index]
+
+    def __setitem__(self, page_index, value):
+        self.stored.pop(page_index, None)
+        self.loaded[page_index] = value
+
+    def __delitem__(self, page_index):
+        if page_index in self.loaded:
+            del self.loaded[page_index]
+        else:
+            del self.stored[page_index]
+
+    def __contains__(self, page_index):
+        return page_index in self.loaded or page_index in self.stored
+
+    def __iter__(self):
+        return iter(list(self.loaded) + list(self.stored))
+
+    def __len__(self):
+        return len(self.loaded) + len(self.stored)
+
+# Open a package from a path (memory-mapped) or from an uploaded file or bytes
+def open_echo_package(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as package_file:
+            mapped = mmap.mmap(package_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return EchoPackage(mapped)
+    if hasattr(source, "getbuffer"):
+        return EchoPackage(source.getbuffer())
+    if hasattr(source, "read"):
+        source.seek(0)
+        return EchoPackage(source.read())
+    return EchoPackage(source)
@@ -0,0 +1,343 @@
+import argparse
+import asyncio
+import io
+import math
+import mimetypes
+import os
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+import wave
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode
+
+import speech_recognition as sr
+import streamlit as st
+import torch
+import transformers
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.Radio_pb2 import Radio
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+# Drives simulated sessions through the real main() flow against one `streamlit run` server,
+# so sessions share the cached model, the Granite lock and the work executors as real readers
+# do, and the reported RSS is that server's. The server runs loadtest_app.py, which replaces
+# the Granite pipeline, the file uploader, the microphone and Google speech recognition with
+# local stand-ins. Each session passes its scripted input to them through its query string.
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Main.py")
+SERVER_ENTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "loadtest_app.py")
+
+# Query parameters read by the stand-ins
+UPLOAD_PARAM = "loadtest_upload"
+COMMAND_PARAM = "loadtest_command"
+
+# Environment variables passing the stand-in settings to the server
+STUB_ENVIRONMENT = ("LOADTEST_DOCUMENT", "LOADTEST_RECORDING", "LOADTEST_TOKEN_LATENCY", "LOADTEST_TOKENS")
+
+# Seconds between server RSS samples while sessions run
+RSS_SAMPLE_SECONDS = 0.2
+
+# Stand-in for the Granite tokenizer
+class StubTokenizer:
+    eos_token_id = 0
+
+    def encode(self, text, add_special_tokens=True):
+        return text.split()
+
+# Stand-in for the Granite pipeline: emits tokens at a fixed rate and honours stopping criteria
+class StubGenerator:
+    def __init__(self, token_latency, tokens):
+        self.tokenizer = StubTokenizer()
+        self.token_latency = token_latency
+        self.tokens = tokens
+
+    def __call__(self, prompt, max_new_tokens=300, stopping_criteria=None, **kwargs):
+        input_ids = torch.zeros((1, 1), dtype=torch.long)
+        generated = []
+        for _ in range(min(self.tokens, max_new_tokens)):
+            time.sleep(self.token_latency)
+            generated.append("word")
+            if stopping_criteria and bool(stopping_criteria(input_ids, None).all()):
+                break
+        return [{"generated_text": f"{prompt} {' '.join(generated)}"}]
+
+# In-memory upload with the attributes main() reads from Streamlit's UploadedFile
+class StubUploadedFile(io.BytesIO):
+    def __init__(self, path, data):
+        super().__init__(data)
+        self.name = os.path.basename(path)
+        self.size = len(data)
+        self.type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.file_id = uuid.uuid4().hex
+
+# Write a short tone to stand in for a recorded voice command
+def write_tone(path, seconds=2.0, sample_rate=16000):
+    with wave.open(path, "wb") as recording:
+        recording.setnchannels(1)
+        recording.setsampwidth(2)
+        recording.setframerate(sample_rate)
+        recording.writeframes(b"".join(
+            struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate)))
+            for i in range(int(seconds * sample_rate))
+        ))
+
+# Replace the model, uploader, microphone and recognizer in the server process
+def install_stubs(document_path, recording_path, token_latency, tokens):
+    with open(document_path, "rb") as document_file:
+        document = document_file.read()
+    uploads = {}
+    uploads_lock = threading.Lock()
+
+    transformers.pipeline = lambda *args, **kwargs: StubGenerator(token_latency, tokens)
+
+    def file_uploader(*args, **kwargs):
+        upload_id = st.query_params.get(UPLOAD_PARAM)
+        if not upload_id:
+            return None
+        # Keep one upload per id so reruns see the same file id
+        with uploads_lock:
+            if upload_id not in uploads:
+                uploads[upload_id] = StubUploadedFile(document_path, document)
+            return uploads[upload_id]
+
+    st.file_uploader = file_uploader
+    sr.Microphone = lambda *args, **kwargs: sr.AudioFile(recording_path)
+    sr.Recognizer.recognize_google = lambda self, audio_data, **kwargs: st.query_params[COMMAND_PARAM]
+
+# Whether the stand-ins are installed in this process
+stubs_installed = False
+stubs_lock = threading.Lock()
+
+# Install the stand-ins once per server process from the settings passed by start_server.
+# Called by loadtest_app.py, which Streamlit executes again on every rerun.
+def install_stubs_from_environment():
+    global stubs_installed
+    with stubs_lock:
+        if stubs_installed:
+            return
+        document_path, recording_path, token_latency, tokens = (os.environ[name] for name in STUB_ENVIRONMENT)
+        install_stubs(document_path, recording_path, float(token_latency), int(tokens))
+        stubs_installed = True
+
+# Start one app server with the stand-ins installed and wait until it accepts connections
+def start_server(document_path, recording_path, token_latency, tokens, timeout):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    environment = dict(os.environ)
+    environment.update(zip(STUB_ENVIRONMENT, (
+        os.path.abspath(document_path), os.path.abspath(recording_path), str(token_latency), str(tokens)
+    )))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", SERVER_ENTRY_PATH,
+         "--server.headless", "true", "--server.address", "127.0.0.1", "--server.port", str(port),
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        env=environment,
+        stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + timeout
+    while True:
+        if server.poll() is not None:
+            raise RuntimeError(f"App server exited with code {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+                if response.status == 200:
+                    return server, port
+        except OSError:
+            pass
+        if time.monotonic() > deadline:
+            server.terminate()
+            raise RuntimeError("App server did not start in time")
+        time.sleep(0.5)
+
+# Current resident set size of a process in MB, or None if it cannot be read
+def rss_mb(pid):
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / 2 ** 20
+    except ImportError:
+        pass
+    try:
+        # Second field of statm is the resident page count (Linux)
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+# Headless browser session speaking Streamlit's websocket protocol. Like the frontend, it
+# resends every widget value on each rerun and takes widget ids from the latest run's elements.
+class AppSession:
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.query = {}
+        self.widgets = {}
+        self.widget_states = {}
+
+    # Rerun the script with the current widget values plus one-off triggers; returns once it finishes
+    async def run(self, *triggers):
+        back_msg = BackMsg()
+        back_msg.rerun_script.query_string = urlencode(self.query)
+        back_msg.rerun_script.widget_states.widgets.extend([*self.widget_states.values(), *triggers])
+        await self.websocket.send(back_msg.SerializeToString())
+
+        widgets = {}
+        while True:
+            forward_msg = ForwardMsg()
+            forward_msg.ParseFromString(await self.websocket.recv())
+            message_type = forward_msg.WhichOneof("type")
+            if message_type == "delta" and forward_msg.delta.WhichOneof("type") == "new_element":
+                element = forward_msg.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception":
+                    raise RuntimeError(element.exception.message)
+                if element_type in ("button", "radio"):
+                    widget = getattr(element, element_type)
+                    widgets[widget.label] = widget
+            elif message_type == "page_info_changed":
+                self.query = dict(parse_qsl(forward_msg.page_info_changed.query_string))
+            elif message_type == "script_finished":
+                if forward_msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("Script failed to compile")
+                # A run stopped for st.rerun() is followed by the next run
+                if forward_msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    break
+
+        self.widgets = widgets
+        widget_ids = {widget.id for widget in widgets.values()}
+        self.widget_states = {
+            widget_id: state for widget_id, state in self.widget_states.items() if widget_id in widget_ids
+        }
+
+    def widget(self, label):
+        if label not in self.widgets:
+            raise LookupError(f"No widget labelled {label!r}")
+        return self.widgets[label]
+
+    async def click(self, label):
+        await self.run(WidgetState(id=self.widget(label).id, trigger_value=True))
+
+    async def choose(self, label, option):
+        radio = self.widget(label)
+        state = WidgetState(id=radio.id)
+        # Newer Streamlit versions send the chosen option, older ones its index
+        if "raw_value" in Radio.DESCRIPTOR.fields_by_name:
+            state.string_value = option
+        else:
+            state.int_value = list(radio.options).index(option)
+        self.widget_states[radio.id] = state
+        await self.run()
+
+# One simulated reader: upload, switch mode, read, then issue voice commands
+async def run_session(websocket, iterations, timeout):
+    latencies = defaultdict(list)
+    session = AppSession(websocket)
+
+    async def timed(interaction, action):
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(action, timeout)
+        except Exception as e:
+            raise RuntimeError(f"{interaction} failed: {e!r}") from e
+        latencies[interaction].append(time.perf_counter() - start)
+
+    await timed("load", session.run())
+    for _ in range(iterations):
+        session.query[UPLOAD_PARAM] = uuid.uuid4().hex
+        await timed("upload", session.run())
+        for mode in ("Summary", "Explanatory", "Neutral"):
+            await timed("mode_switch", session.choose("Narration Mode", mode))
+        await timed("read_text", session.click("🔊 Read Text"))
+        for command in ("next page", "stop", "continue"):
+            session.query[COMMAND_PARAM] = command
+            await timed("voice_command", session.click("🎤 Start Voice Commands"))
+    return latencies
+
+# Run concurrent sessions against the server while sampling its RSS; returns the latencies and peak RSS
+async def run_sessions(port, pid, sessions, iterations, timeout):
+    uri = f"ws://127.0.0.1:{port}/_stcore/stream"
+    # Connect every session first so they all start together
+    websockets_open = [
+        await websockets.connect(uri, subprotocols=["streamlit"], max_size=None) for _ in range(sessions)
+    ]
+    peak = None
+
+    async def sample_rss():
+        nonlocal peak
+        while True:
+            rss = rss_mb(pid)
+            if rss is not None:
+                peak = max(peak or 0.0, rss)
+            await asyncio.sleep(RSS_SAMPLE_SECONDS)
+
+    sampler = asyncio.create_task(sample_rss())
+    try:
+        results = await asyncio.gather(*(
+            run_session(websocket, iterations, timeout) for websocket in websockets_open
+        ))
+    finally:
+        sampler.cancel()
+        for websocket in websockets_open:
+            await websocket.close()
+    return results, peak
+
+# Nearest-rank percentile
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+# Format an RSS figure for the results table
+def format_mb(value):
+    return "n/a" if value is None else f"{value:.1f}"
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test one EchoVerse server with simulated concurrent sessions")
+    parser.add_argument("document", help="PDF or image uploaded by every session")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Numbers of concurrent sessions to test")
+    parser.add_argument("--iterations", type=int, default=2, help="Flows per session")
+    parser.add_argument("--recording", help="WAV file played in place of the microphone")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="Stub model seconds per token")
+    parser.add_argument("--tokens", type=int, default=100, help="Tokens the stub model generates")
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds allowed per interaction")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        recording_path = args.recording
+        if recording_path is None:
+            recording_path = os.path.join(work_dir, "command.wav")
+            write_tone(recording_path)
+        server, port = start_server(args.document, recording_path, args.token_latency, args.tokens, args.timeout)
+        try:
+            print(f"Server RSS at start: {format_mb(rss_mb(server.pid))} MB")
+            print(
+                f"{'sessions':>8} {'interaction':<14} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+                f"{'RSS MB':>8} {'peak MB':>8}"
+            )
+            for sessions in args.concurrency:
+                results, peak = asyncio.run(run_sessions(port, server.pid, sessions, args.iterations, args.timeout))
+                rss = format_mb(rss_mb(server.pid))
+
+                combined = defaultdict(list)
+                for latencies in results:
+                    for interaction, values in latencies.items():
+                        combined[interaction].extend(values)
+                for interaction, values in combined.items():
+                    print(
+                        f"{sessions:>8} {interaction:<14} {len(values):>6} "
+                        f"{percentile(values, 0.50) * 1000:>9.1f} {percentile(values, 0.95) * 1000:>9.1f} "
+                        f"{percentile(values, 0.99) * 1000:>9.1f} {rss:>8} {format_mb(peak):>8}"
+                    )
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import runpy
+
+import loadtest
+
+# Entry script for the load-test server: installs the stand-ins, then runs the app as `streamlit run` would
+loadtest.install_stubs_from_environment()
+runpy.run_path(loadtest.APP_PATH, run_name="__main__")
@@ -0,0 +1,139 @@
+import argparse
+import os
+import random
+
+# Deterministic fixture corpus for benchmark_pdf_backends.py. The PDFs are written by hand
+# (standard Helvetica font, uncompressed content streams) so no PDF library is needed.
+# Each fixture is written with a ground-truth text file holding every page's text,
+# with pages separated by form feeds.
+
+WORDS = (
+    "reading voice page chapter audio story listener narration sentence language book "
+    "summary explain document library access screen braille sound text speech world "
+    "history science river mountain village teacher student morning evening journey"
+).split()
+
+# (file name, page count, layout) for each fixture
+FIXTURES = [
+    ("single_page.pdf", 1, "plain"),
+    ("short_report.pdf", 10, "plain"),
+    ("headed_book.pdf", 50, "headed"),
+    ("two_column_paper.pdf", 20, "columns"),
+    ("long_book.pdf", 200, "headed")
+]
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+LINE_HEIGHT = 14
+
+# Deterministic body lines for one page
+def body_lines(rng, line_count, words_per_line):
+    lines = []
+    for _ in range(line_count):
+        words = [rng.choice(WORDS) for _ in range(words_per_line)]
+        words[0] = words[0].capitalize()
+        lines.append(" ".join(words) + rng.choice([".", ",", "", ""]))
+    return lines
+
+# Escape text for a PDF string literal
+def pdf_string(text):
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+# Content stream drawing lines of text from a starting point
+def text_block(lines, x, y, size=11):
+    commands = [f"BT /F1 {size} Tf {LINE_HEIGHT} TL {x} {y} Td"]
+    for line in lines:
+        commands.append(f"{pdf_string(line)} Tj T*")
+    commands.append("ET")
+    return "\n".join(commands)
+
+# Ground-truth file of a fixture PDF
+def truth_path(pdf_path):
+    return os.path.splitext(pdf_path)[0] + ".txt"
+
+# Content stream for one page of a fixture and the text it draws, in reading order
+def page_content(rng, page_number, layout):
+    blocks = []
+    lines = []
+    if layout in ("headed", "columns"):
+        blocks.append(text_block(["EchoVerse Fixture Corpus"], 72, 760, size=9))
+        lines.append("EchoVerse Fixture Corpus")
+    if layout == "columns":
+        for x in (54, 318):
+            column = body_lines(rng, 46, 5)
+            blocks.append(text_block(column, x, 740, size=10))
+            lines.extend(column)
+    else:
+        body = body_lines(rng, 44, 11)
+        blocks.append(text_block(body, 72, 720))
+        lines.extend(body)
+    if layout in ("headed", "columns"):
+        blocks.append(text_block([str(page_number)], PAGE_WIDTH // 2, 36, size=9))
+        lines.append(str(page_number))
+    return "\n".join(blocks).encode("latin-1"), "\n".join(lines)
+
+# Write a PDF with the given page content streams
+def write_pdf(path, contents):
+    page_count = len(contents)
+    font_id = 3
+    first_page_id = 4
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{first_page_id + 2 * i} 0 R" for i in range(page_count)), page_count
+        ).encode("latin-1"),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+    ]
+    for index, content in enumerate(contents):
+        content_id = first_page_id + 2 * index + 1
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>".encode("latin-1")
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for object_id, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % object_id + body + b"\nendobj\n"
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    with open(path, "wb") as pdf_file:
+        pdf_file.write(output)
+
+# Write every fixture and its ground truth into a directory and return the PDF paths
+def build_fixtures(output_dir, seed=2912):
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for name, page_count, layout in FIXTURES:
+        rng = random.Random(f"{seed}:{name}")
+        path = os.path.join(output_dir, name)
+        contents, texts = zip(*(page_content(rng, page_number, layout) for page_number in range(1, page_count + 1)))
+        write_pdf(path, contents)
+        with open(truth_path(path), "w", encoding="utf-8") as truth_file:
+            truth_file.write("\f".join(texts))
+        paths.append(path)
+    return paths
+
+# Page texts of a fixture's ground truth, or None if it has none
+def read_ground_truth(pdf_path):
+    try:
+        with open(truth_path(pdf_path), encoding="utf-8") as truth_file:
+            return truth_file.read().split("\f")
+    except FileNotFoundError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the PDF fixture corpus used by the backend benchmark")
+    parser.add_argument("output_dir", help="Directory to write the fixtures to")
+    parser.add_argument("--seed", type=int, default=2912, help="Seed for the generated text")
+    args = parser.parse_args()
+    for path in build_fixtures(args.output_dir, args.seed):
+        print(path)
+
+if __name__ == "__main__":
+    main()
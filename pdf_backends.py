@@ -0,0 +1,91 @@
+import io
+from concurrent.futures import CancelledError
+
+# Raised when extraction is abandoned because a newer request superseded it
+class ExtractionCancelled(CancelledError):
+    def __init__(self, pages_done, page_count):
+        super().__init__(f"Extraction cancelled after {pages_done} of {page_count} pages")
+        self.pages_done = pages_done
+        self.pages_skipped = page_count - pages_done
+
+# Per-page cancellation check shared by the backends
+def check_cancelled(cancel_event, pages_done, page_count):
+    if cancel_event is not None and cancel_event.is_set():
+        raise ExtractionCancelled(pages_done, page_count)
+
+# Read an uploaded file, path or bytes into something every backend accepts
+def read_source(source):
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if isinstance(source, str):
+        with open(source, "rb") as pdf_file:
+            return pdf_file.read()
+    source.seek(0)
+    return source.read()
+
+# Extract with pypdfium2 (PDFium, C++)
+def extract_pages_pypdfium2(source, cancel_event=None):
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(read_source(source))
+    pages = []
+    try:
+        for page_index in range(len(pdf)):
+            check_cancelled(cancel_event, page_index, len(pdf))
+            page = pdf[page_index]
+            text_page = page.get_textpage()
+            pages.append(text_page.get_text_range().replace("\r\n", "\n").replace("\r", "\n"))
+            text_page.close()
+            page.close()
+    finally:
+        pdf.close()
+    return pages
+
+# Extract with PyMuPDF (MuPDF, C)
+def extract_pages_pymupdf(source, cancel_event=None):
+    import pymupdf
+
+    pages = []
+    with pymupdf.open(stream=read_source(source), filetype="pdf") as pdf:
+        for page in pdf:
+            check_cancelled(cancel_event, len(pages), pdf.page_count)
+            pages.append(page.get_text())
+    return pages
+
+# Extract with pdfplumber (pure Python layout analysis)
+def extract_pages_pdfplumber(source, cancel_event=None):
+    import pdfplumber
+
+    pages = []
+    with pdfplumber.open(io.BytesIO(read_source(source))) as pdf:
+        for page in pdf.pages:
+            check_cancelled(cancel_event, len(pages), len(pdf.pages))
+            pages.append(page.extract_text() or "")
+    return pages
+
+# Available backends by name
+PDF_BACKENDS = {
+    "pypdfium2": extract_pages_pypdfium2,
+    "pymupdf": extract_pages_pymupdf,
+    "pdfplumber": extract_pages_pdfplumber
+}
+
+# Backends tried in order for plain-text and layout-aware extraction
+FAST_BACKEND_ORDER = ["pypdfium2", "pymupdf", "pdfplumber"]
+LAYOUT_BACKEND_ORDER = ["pdfplumber"]
+
+# Extract one text entry per page with the first backend that is installed and succeeds
+def extract_pages(source, layout=False, cancel_event=None):
+    errors = []
+    for name in LAYOUT_BACKEND_ORDER if layout else FAST_BACKEND_ORDER:
+        try:
+            return name, PDF_BACKENDS[name](source, cancel_event)
+        except ImportError:
+            continue
+        except ExtractionCancelled:
+            raise
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+    if errors:
+        raise RuntimeError("; ".join(errors))
+    raise RuntimeError("No PDF backend is installed (install pypdfium2, pymupdf or pdfplumber)")
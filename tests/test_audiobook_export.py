@@ -0,0 +1,24 @@
+import io
+import wave
+
+from audiobook_export import SEGMENT_SAMPLE_RATE, is_segment_audio
+
+def wav_bytes(channels=1, sample_width=2, sample_rate=SEGMENT_SAMPLE_RATE, frames=100):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as segment:
+        segment.setnchannels(channels)
+        segment.setsampwidth(sample_width)
+        segment.setframerate(sample_rate)
+        segment.writeframes(b"\x00" * channels * sample_width * frames)
+    return buffer.getvalue()
+
+def test_segment_layout_is_accepted():
+    assert is_segment_audio(wav_bytes())
+
+def test_other_layouts_and_non_wav_data_are_rejected():
+    assert not is_segment_audio(wav_bytes(channels=2))
+    assert not is_segment_audio(wav_bytes(sample_width=1))
+    assert not is_segment_audio(wav_bytes(sample_rate=44100))
+    assert not is_segment_audio(wav_bytes(frames=0))
+    assert not is_segment_audio(b"not audio at all")
+    assert not is_segment_audio(b"")
@@ -0,0 +1,93 @@
+import hashlib
+import io
+import json
+
+import pytest
+
+from echo_package import HEADER, open_echo_package, write_echo_package
+
+PAGES = ["Café au lait, naïve façade.", "", "日本語のページです。二行目。", "Emoji 🎧 and ünïcödé text."]
+
+# Character offsets of each page in the "page\n" joined document text
+def page_offsets(pages):
+    offsets = [0]
+    for page_text in pages:
+        offsets.append(offsets[-1] + (len(page_text) + 1 if page_text else 0))
+    return offsets
+
+def document_text(pages):
+    return "".join(page_text + "\n" for page_text in pages if page_text)
+
+def write_package(pages=PAGES, enhanced=None, audio=None):
+    package_file = io.BytesIO()
+    write_echo_package(package_file, "book.pdf", pages, page_offsets(pages), [0, 12], enhanced, audio,
+                       {"normalization_stats": None})
+    return package_file.getvalue()
+
+def audio_segment(tmp_path, text, data):
+    path = tmp_path / f"{len(text)}.wav"
+    path.write_bytes(data)
+    key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return key, {"path": str(path), "text": text, "language_code": "en", "voice_type": "Female"}
+
+def test_round_trip_from_bytes_and_memory_map(tmp_path):
+    data = write_package()
+    path = tmp_path / "book.echo"
+    path.write_bytes(data)
+    for package in (open_echo_package(io.BytesIO(data)), open_echo_package(str(path))):
+        assert package.name == "book.pdf"
+        assert list(package.pages) == PAGES
+        assert list(package.page_offsets) == page_offsets(PAGES)
+        assert list(package.sentence_offsets) == [0, 12]
+        assert str(package.text) == document_text(PAGES)
+
+def test_text_slices_across_multibyte_pages():
+    package = open_echo_package(write_package())
+    text = document_text(PAGES)
+    assert len(package.text) == len(text)
+    for start in range(len(text) + 1):
+        for stop in range(start, len(text) + 2):
+            assert package.text[start:stop] == text[start:stop]
+
+def test_stored_enhancements_are_listed_and_survive_a_re_save():
+    enhanced = {"formal": {0: "Café, formally.", 3: "🎧 formal emoji."}}
+    package = open_echo_package(write_package(enhanced=enhanced))
+    cache = package.enhanced_cache("formal")
+    assert len(cache) == 2
+    assert sorted(cache) == [0, 3]
+    assert 3 in cache and 1 not in cache
+
+    # New pages sit alongside stored ones that were never looked up
+    cache[2] = "日本語、丁寧に。"
+    assert dict(cache.items()) == {0: "Café, formally.", 2: "日本語、丁寧に。", 3: "🎧 formal emoji."}
+    assert cache.setdefault(0, "replaced") == "Café, formally."
+    del cache[3]
+    assert sorted(cache) == [0, 2]
+
+    resaved = open_echo_package(write_package(enhanced={"formal": dict(cache)}))
+    assert dict(resaved.enhanced_cache("formal")) == {0: "Café, formally.", 2: "日本語、丁寧に。"}
+
+def test_audio_segments_keep_their_source(tmp_path):
+    key, segment = audio_segment(tmp_path, "Café au lait", b"RIFF-audio")
+    package = open_echo_package(write_package(audio={key: segment}))
+    assert package.audio_keys == [key]
+    assert bytes(package.audio(key)) == b"RIFF-audio"
+    assert package.audio_source(key) == ("Café au lait", "en", "Female")
+
+def test_invalid_audio_keys_are_rejected(tmp_path):
+    key, segment = audio_segment(tmp_path, "text", b"audio")
+    with pytest.raises(ValueError):
+        write_package(audio={"../../escape": segment})
+
+    # A manifest edited to point an audio key outside the cache is refused on open
+    data = bytearray(write_package(audio={key: segment}))
+    magic, version, manifest_offset, manifest_length = HEADER.unpack_from(data, 0)
+    manifest = json.loads(bytes(data[manifest_offset:manifest_offset + manifest_length]))
+    manifest["audio"] = {"../../escape": manifest["audio"][key]}
+    tampered = json.dumps(manifest).encode("utf-8")
+    data[manifest_offset:] = tampered
+    HEADER.pack_into(data, 0, magic, version, manifest_offset, len(tampered))
+    with pytest.raises(ValueError):
+        open_echo_package(bytes(data))
+    with pytest.raises(ValueError):
+        open_echo_package(write_package()).audio(key + "\n")
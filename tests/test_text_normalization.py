@@ -0,0 +1,53 @@
+from text_normalization import normalize_pages
+
+# Page body long enough that its first and last lines are the only edge lines
+def body(page_number):
+    return "\n".join(f"Body line {page_number}.{line}" for line in range(1, 7))
+
+def test_numbered_headings_survive_in_short_documents():
+    pages = [f"Chapter {number}\n{body(number)}" for number in (1, 2, 3)]
+    normalized = normalize_pages(pages)
+    for number, page_text in enumerate(normalized, start=1):
+        assert page_text.startswith(f"Chapter {number}\n")
+
+def test_numbered_headings_are_not_treated_as_running_headers():
+    pages = [f"Chapter {number}\n{body(number)}" for number in range(1, 7)]
+    normalized = normalize_pages(pages)
+    assert all(f"Chapter {number}" in page_text for number, page_text in enumerate(normalized, start=1))
+
+def test_running_headers_and_page_footers_are_removed():
+    pages = [f"The Book Title\n{body(number)}\nPage {number} of 5" for number in range(1, 6)]
+    normalized = normalize_pages(pages)
+    assert normalized == [body(number) for number in range(1, 6)]
+
+def test_bare_page_numbers_are_removed_when_they_follow_the_pages():
+    pages = [f"{body(number)}\n{number + 10}" for number in range(1, 6)]
+    assert normalize_pages(pages) == [body(number) for number in range(1, 6)]
+
+def test_single_page_keeps_trailing_numbers():
+    assert normalize_pages(["Total\n42"]) == ["Total\n42"]
+
+def test_years_at_page_edges_are_kept():
+    pages = [f"{body(number)}\n2019" for number in range(1, 6)]
+    assert all(page_text.endswith("2019") for page_text in normalize_pages(pages))
+
+def test_hyphenated_compound_keeps_its_hyphen():
+    assert normalize_pages(["A well-\nknown result."]) == ["A well-known result."]
+
+def test_hyphenated_break_joins_words_used_elsewhere():
+    pages = ["The hyphen-\nated word.", "Another hyphenated word."]
+    assert normalize_pages(pages)[0] == "The hyphenated word."
+
+def test_syllable_breaks_are_joined():
+    pages = ["The accom-\nmodation is near the govern-\nment office."]
+    assert normalize_pages(pages) == ["The accommodation is near the government office."]
+
+def test_hyphenated_form_used_elsewhere_keeps_its_hyphen():
+    pages = ["A follow-\nup visit.", "The follow-up was late."]
+    assert normalize_pages(pages)[0] == "A follow-up visit."
+
+def test_capitalised_second_part_keeps_its_hyphen():
+    assert normalize_pages(["Anglo-\nSaxon poetry."]) == ["Anglo-Saxon poetry."]
+
+def test_whitespace_is_collapsed():
+    assert normalize_pages(["  Too   many\t spaces \n\n\n\nhere  "]) == ["Too many spaces\n\nhere"]
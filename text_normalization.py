@@ -0,0 +1,124 @@
+import hashlib
+import math
+import re
+from collections import Counter
+
+# Lines repeated on at least this share of pages are running headers or footers
+REPEATED_LINE_RATIO = 0.5
+
+# Fewer text pages than this give too little evidence to call a line a running header
+MIN_PAGES_FOR_REPEATS = 4
+
+# Number of lines at the top and bottom of each page checked for headers and footers
+EDGE_LINES = 3
+
+# Lines that name a page explicitly, such as "Page 12" or "Page 12 of 40"
+PAGE_LABEL_LINE = re.compile(r"^\s*page\s+\d+\s*((of|/)\s*\d+)?\s*$", re.IGNORECASE)
+
+# Lines holding only a number, such as "12" or "- 12 -"
+BARE_NUMBER_LINE = re.compile(r"^\s*[-–—]?\s*(\d+)\s*[-–—]?\s*$")
+
+# Page references inside running headers, such as "My Book · Page 12"
+PAGE_REFERENCE = re.compile(r"\bpage\s+\d+(\s*(of|/)\s*\d+)?", re.IGNORECASE)
+
+# Word split across lines with a hyphen
+HYPHENATED_BREAK = re.compile(r"([^\W\d_]+)-[ \t]*\n[ \t]*([^\W\d_]+)")
+
+# Words (including hyphenated compounds) used to decide how to rejoin a split word
+WORD = re.compile(r"[^\W\d_]+(?:-[^\W\d_]+)*")
+
+# First elements of compounds that keep their hyphen, such as "well-known" or "self-aware"
+COMPOUND_PREFIXES = {
+    "self", "well", "half", "cross", "twenty", "thirty", "forty", "fifty", "sixty", "seventy",
+    "eighty", "ninety"
+}
+
+# Hash a line so running headers match across pages; only page references are masked,
+# so numbered headings such as "Chapter 1" and "Chapter 2" stay distinct
+def line_signature(line):
+    key = PAGE_REFERENCE.sub("page #", " ".join(line.lower().split()))
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+
+# Indices of the header and footer lines of a page; short pages keep most lines as body text
+def edge_line_indices(line_count):
+    edge_count = min(EDGE_LINES, max(1, line_count // 3))
+    return set(range(min(edge_count, line_count))) | set(range(max(line_count - edge_count, 0), line_count))
+
+# Difference between printed page numbers and page positions, if bare edge numbers follow the pages
+def page_number_offset(page_lines, text_pages):
+    offsets = Counter()
+    for page_index, lines in enumerate(page_lines):
+        offsets.update({
+            int(match.group(1)) - page_index
+            for match in (BARE_NUMBER_LINE.match(lines[index]) for index in edge_line_indices(len(lines)))
+            if match
+        })
+    if not offsets:
+        return None
+    offset, count = offsets.most_common(1)[0]
+    if count >= max(2, math.ceil(REPEATED_LINE_RATIO * text_pages)):
+        return offset
+    return None
+
+# Whether an edge line is page furniture rather than content
+def is_page_furniture(line, page_index, repeated, number_offset):
+    if PAGE_LABEL_LINE.match(line):
+        return True
+    number = BARE_NUMBER_LINE.match(line)
+    if number:
+        return number_offset is not None and int(number.group(1)) - page_index == number_offset
+    return line_signature(line) in repeated
+
+# Rejoin a word split across lines. The hyphen is dropped unless the document uses the
+# hyphenated form more than the joined one, the second part is capitalised (as in "Anglo-Saxon"),
+# or the first part is a common compound prefix and the joined form is not used elsewhere.
+def rejoin_hyphenated(match, vocabulary):
+    prefix, suffix = match.group(1), match.group(2)
+    joined = prefix + suffix
+    joined_count = vocabulary[joined.lower()]
+    if vocabulary[f"{prefix}-{suffix}".lower()] > joined_count or suffix[0].isupper():
+        return f"{prefix}-{suffix}"
+    if prefix.lower() in COMPOUND_PREFIXES and not joined_count:
+        return f"{prefix}-{suffix}"
+    return joined
+
+# Strip running headers, footers and page numbers, rejoin hyphenated words and collapse whitespace.
+# Single-page inputs are only cleaned up for whitespace and hyphenation.
+def normalize_pages(pages):
+    page_lines = [page_text.splitlines() for page_text in pages]
+    text_pages = sum(1 for lines in page_lines if any(line.strip() for line in lines))
+
+    # Count on how many pages each edge line appears
+    repeated = set()
+    if text_pages >= MIN_PAGES_FOR_REPEATS:
+        signature_counts = Counter()
+        for lines in page_lines:
+            signature_counts.update({
+                line_signature(lines[index])
+                for index in edge_line_indices(len(lines))
+                if lines[index].strip() and not BARE_NUMBER_LINE.match(lines[index])
+            })
+        threshold = math.ceil(REPEATED_LINE_RATIO * text_pages)
+        repeated = {signature for signature, count in signature_counts.items() if count >= threshold}
+
+    multi_page = text_pages > 1
+    number_offset = page_number_offset(page_lines, text_pages) if multi_page else None
+
+    kept_pages = []
+    for page_index, lines in enumerate(page_lines):
+        edges = edge_line_indices(len(lines))
+        kept_pages.append("\n".join(
+            line for index, line in enumerate(lines)
+            if not (multi_page and index in edges and line.strip()
+                    and is_page_furniture(line, page_index, repeated, number_offset))
+        ))
+
+    vocabulary = Counter(word.lower() for page_text in kept_pages for word in WORD.findall(page_text))
+    normalized = []
+    for page_text in kept_pages:
+        page_text = HYPHENATED_BREAK.sub(lambda match: rejoin_hyphenated(match, vocabulary), page_text)
+        page_text = re.sub(r"[ \t\f\v]+", " ", page_text)
+        page_text = re.sub(r" ?\n ?", "\n", page_text)
+        page_text = re.sub(r"\n{3,}", "\n\n", page_text)
+        normalized.append(page_text.strip())
+    return normalized